@@ -0,0 +1,139 @@
+import pandas as pd
+import numpy as np
+import urllib.request
+from contextlib import contextmanager
+from auxiliares import normalize_column_names
+
+# --------------------------
+# Configurações
+# --------------------------
+
+TAMANHO_BLOCO = 50_000
+CHAVES_CUBO = ['data', 'nome', 'cidade', 'imagem']
+COLUNAS_SOMA = ['numero_de_pontos', 'h/h', 'extensao']
+COLUNAS_CUBO = COLUNAS_SOMA + ['pontos_com_hh']  # pontos_com_hh: pontos só das linhas com H/H informado
+
+# --------------------------
+# Funções Auxiliares
+# --------------------------
+
+@contextmanager
+def abrir_fonte(fonte):
+    """Abre a fonte (URL ou caminho local) como um fluxo binário, sem carregá-la inteira na memória."""
+    if fonte.startswith(('http://', 'https://')):
+        with urllib.request.urlopen(fonte) as resposta:
+            yield resposta
+    else:
+        with open(fonte, 'rb') as arquivo:
+            yield arquivo
+
+def ler_blocos(fluxo, encoding, tamanho_bloco=TAMANHO_BLOCO):
+    """Lê o CSV em blocos de tamanho limitado, já com colunas normalizadas e datas convertidas."""
+    leitor = pd.read_csv(fluxo, delimiter=';', encoding=encoding, on_bad_lines='skip', chunksize=tamanho_bloco)
+    for bloco in leitor:
+        bloco = normalize_column_names(bloco)
+        if 'data' not in bloco.columns:
+            raise KeyError("A coluna 'data' não foi encontrada no arquivo.")
+        bloco['data'] = pd.to_datetime(bloco['data'], format='%d/%m/%Y', errors='coerce')
+        yield bloco.dropna(subset=['data'])
+
+def _para_numero(serie):
+    """Converte uma coluna para número, aceitando vírgula como separador decimal."""
+    if serie.dtype == object:
+        serie = serie.astype(str).str.replace(',', '.', regex=False)
+    return pd.to_numeric(serie, errors='coerce')
+
+def eh_cubo(df):
+    """Indica se o DataFrame já é (um recorte de) um cubo montado por montar_cubo."""
+    return df.attrs.get('cubo', False)
+
+def montar_cubo(df):
+    """Agrega registros pelas chaves do cubo (data, nome, cidade, imagem), somando as colunas numéricas.
+
+    É a única definição do cubo: usada bloco a bloco no modo agregado e pelo motor de produtividade.
+    Grupos sem nenhum valor numa coluna ficam com NaN (e não 0), e `pontos_com_hh` guarda os pontos
+    das linhas com H/H informado, para que as razões por H/H não contem pontos sem horas.
+    """
+    chaves = pd.DataFrame({chave: df[chave] if chave in df.columns else 'Não informado'
+                           for chave in CHAVES_CUBO}, index=df.index)
+    chaves['data'] = pd.to_datetime(chaves['data']).dt.normalize()
+    chaves = chaves.fillna('Não informado')
+    valores = pd.DataFrame({coluna: _para_numero(df[coluna]) if coluna in df.columns else np.nan
+                            for coluna in COLUNAS_SOMA}, index=df.index)
+    valores['pontos_com_hh'] = valores['numero_de_pontos'].where(valores['h/h'].notna())
+    cubo = pd.concat([chaves, valores], axis=1).groupby(CHAVES_CUBO)[COLUNAS_CUBO].sum(min_count=1)
+    cubo.attrs['cubo'] = True
+    return cubo
+
+# --------------------------
+# Agregação em Blocos
+# --------------------------
+
+def agregar_em_blocos(fluxo, encoding, tamanho_bloco=TAMANHO_BLOCO):
+    """Percorre o CSV em blocos e acumula o cubo (data, nome, cidade, imagem) e os limites de data.
+
+    A memória usada depende apenas do tamanho do bloco e do número de combinações do cubo,
+    e não do tamanho do arquivo.
+    """
+    cubo = None
+    data_min = data_max = None
+    linhas = 0
+    for bloco in ler_blocos(fluxo, encoding, tamanho_bloco):
+        if bloco.empty:
+            continue
+        linhas += len(bloco)
+        parcial = montar_cubo(bloco)
+        cubo = parcial if cubo is None else cubo.add(parcial, fill_value=0)
+        inicio, fim = bloco['data'].min(), bloco['data'].max()
+        data_min = inicio if data_min is None else min(data_min, inicio)
+        data_max = fim if data_max is None else max(data_max, fim)
+
+    cubo = pd.DataFrame() if cubo is None else cubo.reset_index()
+    cubo.attrs['cubo'] = True
+    return {'cubo': cubo, 'data_min': data_min, 'data_max': data_max, 'linhas': linhas}
+
+def agregar_fonte(fonte, encodings, tamanho_bloco=TAMANHO_BLOCO):
+    """Agrega a fonte tentando cada encoding em sequência; reinicia a leitura a cada tentativa."""
+    ultimo_erro = None
+    for encoding in encodings:
+        try:
+            with abrir_fonte(fonte) as fluxo:
+                resultado = agregar_em_blocos(fluxo, encoding, tamanho_bloco)
+            resultado['encoding'] = encoding
+            return resultado
+        except UnicodeDecodeError as e:
+            ultimo_erro = e
+    raise ultimo_erro
+
+def resumos(cubo):
+    """Retorna os agregados diário, por nome e por cidade derivados do cubo."""
+    return {
+        'diario': cubo.groupby('data', as_index=False)[COLUNAS_CUBO].sum(min_count=1),
+        'por_nome': cubo.groupby('nome', as_index=False)[COLUNAS_CUBO].sum(min_count=1),
+        'por_cidade': cubo.groupby('cidade', as_index=False)[COLUNAS_CUBO].sum(min_count=1),
+    }
+
+# --------------------------
+# Detalhamento sob Demanda
+# --------------------------
+
+def carregar_detalhe(fonte, encoding, inicio, fim, nomes=None, limite=5000, tamanho_bloco=TAMANHO_BLOCO):
+    """Busca os registros brutos de uma janela estreita de datas e nomes, lendo a fonte em blocos."""
+    inicio, fim = pd.to_datetime(inicio), pd.to_datetime(fim)
+    selecionados = []
+    total = 0
+    with abrir_fonte(fonte) as fluxo:
+        for bloco in ler_blocos(fluxo, encoding, tamanho_bloco):
+            filtro = (bloco['data'] >= inicio) & (bloco['data'] <= fim)
+            if nomes and 'nome' in bloco.columns:
+                filtro &= bloco['nome'].isin(nomes)
+            bloco = bloco[filtro]
+            if bloco.empty:
+                continue
+            selecionados.append(bloco.head(limite - total))
+            total += len(selecionados[-1])
+            if total >= limite:
+                break
+    if not selecionados:
+        return pd.DataFrame()
+    return pd.concat(selecionados, ignore_index=True)
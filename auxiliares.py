@@ -0,0 +1,50 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import unicodedata
+from datetime import date
+
+# --------------------------
+# Configurações
+# --------------------------
+
+FORMATOS_DATA = ['%m/%d/%Y', '%d/%m/%Y']  # Formatos de data em texto aceitos na planilha de controle
+
+# --------------------------
+# Funções Auxiliares Compartilhadas
+# --------------------------
+
+def remove_accents(input_str):
+    """Remove acentos de uma string."""
+    nfkd_form = unicodedata.normalize('NFKD', input_str)
+    return ''.join([c for c in nfkd_form if not unicodedata.combining(c)])
+
+def normalize_column_names(df):
+    """Remove acentos e converte os nomes das colunas para minúsculas."""
+    df.columns = [remove_accents(col).strip().lower().replace(' ', '_') for col in df.columns]
+    return df
+
+def versao_dados(df):
+    """Gera um identificador da versão dos dados a partir das colunas, dos tipos e do conteúdo do DataFrame."""
+    esquema = '|'.join(f"{coluna}:{tipo}" for coluna, tipo in df.dtypes.items())
+    conteudo = pd.util.hash_pandas_object(df, index=False).values
+    assinatura = hashlib.sha256(esquema.encode())
+    assinatura.update(conteudo.tobytes())
+    return assinatura.hexdigest()[:16]
+
+def converter_datas(serie, formatos=FORMATOS_DATA):
+    """Converte uma coluna que mistura células de data e datas em texto com formatos diferentes.
+
+    As células que já são datas são mantidas. Os textos são lidos com formatos explícitos, começando
+    pelo que reconhece mais textos da coluna; os demais formatos só preenchem o que ficou sem data.
+    Valores não reconhecidos viram NaT.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    eh_data = serie.map(lambda valor: isinstance(valor, (date, np.datetime64)))
+    datas = pd.to_datetime(serie.where(eh_data), errors='coerce')
+    textos = serie[~eh_data & serie.notna()].astype(str).str.strip()
+    lidas = {formato: pd.to_datetime(textos, format=formato, errors='coerce') for formato in formatos}
+    for formato in sorted(formatos, key=lambda formato: lidas[formato].notna().sum(), reverse=True):
+        datas.loc[textos.index] = datas.loc[textos.index].fillna(lidas[formato])
+    return datas
@@ -0,0 +1,111 @@
+import streamlit as st
+import hashlib
+import json
+import threading
+import numpy as np
+from collections import OrderedDict
+from auxiliares import versao_dados
+
+# --------------------------
+# Configurações
+# --------------------------
+
+LIMITE_BYTES = 64 * 1024 * 1024  # Memória máxima ocupada pelas figuras (estimada por estimar_bytes)
+PROPRIEDADES_ARRAY = ('x', 'y', 'z', 'lat', 'lon', 'text', 'hovertext', 'customdata', 'ids')
+BYTES_POR_OBJETO = 64  # Estimativa para cada valor não numérico (textos, datas como objetos)
+BYTES_BASE_FIGURA = 8 * 1024  # Layout e atributos escalares dos traços
+
+# --------------------------
+# Cache de Figuras
+# --------------------------
+
+class CacheGraficos:
+    """Cache LRU de figuras plotly já construídas, limitado pelo tamanho total em bytes.
+
+    Guarda objetos go.Figure e não JSON: o st.plotly_chart sempre valida e serializa a figura
+    recebida, e a partir de um go.Figure esse passo é bem mais barato do que a partir de um
+    dicionário. O tamanho de cada figura é estimado pelos arrays dos traços (estimar_bytes), sem
+    serializá-la. É compartilhado entre sessões (via st.cache_resource), por isso todas as
+    operações usam um lock. As figuras não devem ser alteradas por quem as recebe.
+    """
+
+    def __init__(self, limite_bytes=LIMITE_BYTES):
+        self.limite_bytes = limite_bytes
+        self.bytes_usados = 0
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave, construir):
+        """Retorna a figura da chave, construindo e armazenando-a em caso de falha."""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[0]
+            self.falhas += 1
+
+        figura = construir()
+        tamanho = estimar_bytes(figura)
+        with self._lock:
+            if tamanho <= self.limite_bytes and chave not in self._itens:
+                self._itens[chave] = (figura, tamanho)
+                self.bytes_usados += tamanho
+                while self.bytes_usados > self.limite_bytes:
+                    _, (_, tamanho_removido) = self._itens.popitem(last=False)
+                    self.bytes_usados -= tamanho_removido
+        return figura
+
+    def estatisticas(self):
+        """Retorna acertos, falhas, número de figuras e memória usada."""
+        with self._lock:
+            return {
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'figuras': len(self._itens),
+                'bytes': self.bytes_usados,
+            }
+
+@st.cache_resource
+def obter_cache_graficos():
+    """Retorna a instância única do cache de figuras, compartilhada por todas as sessões."""
+    return CacheGraficos()
+
+# --------------------------
+# Funções Auxiliares
+# --------------------------
+
+def estimar_bytes(figura):
+    """Estima a memória da figura pelos arrays de dados dos traços, sem serializá-la."""
+    total = BYTES_BASE_FIGURA
+    for traco in figura.data:
+        for nome in PROPRIEDADES_ARRAY:
+            valores = traco[nome] if nome in traco else None
+            if valores is None:
+                continue
+            if isinstance(valores, np.ndarray) and valores.dtype.kind in 'biufcmM':
+                total += valores.nbytes
+            else:
+                total += len(valores) * BYTES_POR_OBJETO
+    return total
+
+def hash_filtros(**filtros):
+    """Gera um hash estável para o estado dos filtros e parâmetros do gráfico."""
+    conteudo = json.dumps(filtros, sort_keys=True, default=str)
+    return hashlib.sha256(conteudo.encode()).hexdigest()[:16]
+
+def figura_em_cache(df, tipo, construir, **filtros):
+    """Obtém a figura do cache pela chave (versão dos dados, hash dos filtros, tipo de gráfico)."""
+    chave = (versao_dados(df), hash_filtros(**filtros), tipo)
+    return obter_cache_graficos().obter(chave, construir)
+
+def exibir_estatisticas_cache():
+    """Exibe na barra lateral os acertos e falhas do cache de figuras."""
+    estatisticas = obter_cache_graficos().estatisticas()
+    with st.sidebar.expander("📦 Cache de Gráficos"):
+        col1, col2 = st.columns(2)
+        col1.metric("Acertos", estatisticas['acertos'])
+        col2.metric("Falhas", estatisticas['falhas'])
+        st.write(f"{estatisticas['figuras']} figuras, {estatisticas['bytes'] / 1024 / 1024:.1f} MB")
@@ -0,0 +1,273 @@
+"""Teste de carga do Dashboard FITec com várias sessões simultâneas.
+
+Executa o streamlit_app.py sem interface (streamlit.testing.v1.AppTest), com uma sessão por
+thread no mesmo processo, como no servidor do Streamlit. Cada sessão faz login, aplica filtros
+aleatórios de data e nome e interage com os controles das abas. Ao final, informa as latências
+p50/p95 dos reruns, o uso de CPU e a memória para cada número de sessões: a memória
+residente antes do nível, o pico durante ele e o acréscimo por sessão, (pico - base) / sessões.
+
+Cada nível roda num processo novo, para não herdar os caches dos níveis anteriores. Nele, uma
+sessão de aquecimento carrega os módulos e preenche os caches antes da medição; o custo dessa
+primeira sessão é informado à parte, na linha "partida a frio".
+
+Uso:
+    python carga.py --sessoes 1 5 10 --linhas 50000 --nomes 20 --acoes 10
+"""
+import argparse
+import ast
+import concurrent.futures
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "streamlit_app.py")
+USUARIO = "projeto"
+SENHA = "FITEC_MA"
+
+# --------------------------
+# Ajustes para Sessões Simultâneas
+# --------------------------
+# O AppTest foi feito para uma sessão por vez. Para várias sessões em threads:
+# - cada execução instala um Runtime simulado global e o remove ao terminar, o que quebra
+#   as outras sessões em andamento ("Runtime hasn't been created!"). Aqui o último Runtime
+#   instalado continua visível para todas, como o Runtime único de um servidor real;
+# - o script é compilado a cada execução, e o ast.parse do CPython 3.11 não é seguro entre
+#   threads ("AST constructor recursion depth mismatch"). Só a compilação é serializada.
+
+_ultimo_runtime = None
+
+def _runtime_instance(cls):
+    global _ultimo_runtime
+    if cls._instance is not None:
+        _ultimo_runtime = cls._instance
+    if _ultimo_runtime is None:
+        raise RuntimeError("Runtime hasn't been created!")
+    return _ultimo_runtime
+
+def _runtime_exists(cls):
+    return cls._instance is not None or _ultimo_runtime is not None
+
+_ast_parse = ast.parse
+_ast_lock = threading.Lock()
+
+def _ast_parse_serializado(*args, **kwargs):
+    with _ast_lock:
+        return _ast_parse(*args, **kwargs)
+
+def preparar_sessoes_simultaneas():
+    """Aplica os ajustes acima; chamado uma vez antes de iniciar as sessões."""
+    from streamlit.runtime import Runtime
+
+    Runtime.instance = classmethod(_runtime_instance)
+    Runtime.exists = classmethod(_runtime_exists)
+    ast.parse = _ast_parse_serializado
+
+# --------------------------
+# Dados Sintéticos
+# --------------------------
+
+def gerar_dados_sinteticos(caminho, linhas, nomes, dias, seed=0):
+    """Gera um CSV no formato da planilha de controle com registros aleatórios dos últimos dias."""
+    rng = np.random.default_rng(seed)
+    hoje = pd.Timestamp(date.today())
+    datas = hoje - pd.to_timedelta(rng.integers(0, dias, linhas), unit='D')
+    df = pd.DataFrame({
+        'Nome': rng.choice([f"Operador {i:03d}" for i in range(nomes)], linhas),
+        'numero de pontos': rng.integers(20, 600, linhas),
+        'data': datas.strftime('%d/%m/%Y'),
+        'H/H': rng.choice([4, 6, 8], linhas),
+        'imagem': rng.choice([f"IMG_{i:04d}" for i in range(max(nomes // 2, 1))], linhas),
+        'cidade': rng.choice(['São Luiz', 'Area teste', 'Imperatriz'], linhas),
+        'pontos por imagem': '',
+        'extensao': rng.integers(0, 5000, linhas),
+    })
+    df.to_csv(caminho, sep=';', index=False)
+    return sorted(df['Nome'].unique())
+
+# --------------------------
+# Medições do Processo
+# --------------------------
+
+def memoria_rss_mb():
+    """Retorna a memória residente atual do processo em MB (ou o pico, fora do Linux)."""
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    # ru_maxrss é o pico do processo: em bytes no macOS e em KB nos demais sistemas
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor
+
+class AmostradorMemoria(threading.Thread):
+    """Amostra a memória residente em segundo plano e guarda o pico observado."""
+
+    def __init__(self, intervalo=0.05):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.pico = memoria_rss_mb()
+        self._parar = threading.Event()
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            self.pico = max(self.pico, memoria_rss_mb())
+
+    def parar(self):
+        """Encerra a amostragem e retorna o pico em MB."""
+        self._parar.set()
+        self.join()
+        self.pico = max(self.pico, memoria_rss_mb())
+        return self.pico
+
+# --------------------------
+# Sessões Simuladas
+# --------------------------
+
+def _medir(latencias, at):
+    """Executa um rerun da sessão e registra a latência em segundos."""
+    inicio = time.perf_counter()
+    at.run()
+    latencias.append(time.perf_counter() - inicio)
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+def _widget(widgets, rotulo):
+    """Retorna o primeiro widget com o rótulo informado, ou None se a aba não o exibir."""
+    return next((widget for widget in widgets if widget.label.startswith(rotulo)), None)
+
+def executar_sessao(nomes, acoes, dias, seed, timeout):
+    """Simula uma sessão: login, filtros aleatórios e interação com as abas. Retorna as latências."""
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    latencias = []
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    _medir(latencias, at)
+
+    # Login pela tela inicial; o dashboard aparece no rerun seguinte
+    at.text_input(key="username").input(USUARIO)
+    at.text_input(key="password").input(SENHA)
+    at.button[0].click()
+    _medir(latencias, at)
+    _medir(latencias, at)
+
+    for _ in range(acoes):
+        acao = rng.choice(['nomes', 'datas', 'suavizacao', 'nomes_exibidos', 'zoom'])
+        if acao == 'nomes':
+            at.sidebar.multiselect[0].set_value(rng.sample(nomes, rng.randint(1, len(nomes))))
+        elif acao == 'datas':
+            fim = date.today() - timedelta(days=rng.randint(0, dias // 2))
+            at.sidebar.date_input[0].set_value(fim - timedelta(days=rng.randint(1, dias)))
+            at.sidebar.date_input[1].set_value(fim)
+        elif acao == 'suavizacao' and _widget(at.main.slider, "Janela de Suavização"):
+            _widget(at.main.slider, "Janela de Suavização").set_value(rng.randint(1, 30))
+        elif acao == 'nomes_exibidos' and _widget(at.main.multiselect, "Nomes Exibidos"):
+            widget = _widget(at.main.multiselect, "Nomes Exibidos")
+            widget.set_value(rng.sample(widget.options, rng.randint(0, len(widget.options))))
+        elif acao == 'zoom' and _widget(at.main.slider, "Zoom"):
+            _widget(at.main.slider, "Zoom").set_value(rng.randint(4, 18))
+        _medir(latencias, at)
+    return latencias
+
+def executar_nivel(sessoes, nomes, acoes, dias, seed, timeout):
+    """Executa várias sessões simultâneas e resume latências, CPU e memória."""
+    rss_base = memoria_rss_mb()
+    amostrador = AmostradorMemoria()
+    amostrador.start()
+    cpu_inicio, inicio = time.process_time(), time.perf_counter()
+    latencias, falhas = [], 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=sessoes) as executor:
+        futuros = [executor.submit(executar_sessao, nomes, acoes, dias, seed + i, timeout) for i in range(sessoes)]
+        for futuro in concurrent.futures.as_completed(futuros):
+            try:
+                latencias.extend(futuro.result())
+            except Exception as e:
+                falhas += 1
+                print(f"  sessão falhou: {e!r}")
+    duracao = time.perf_counter() - inicio
+    rss_pico = amostrador.parar()
+    return {
+        'sessoes': sessoes,
+        'reruns': len(latencias),
+        'falhas': falhas,
+        'p50_s': np.percentile(latencias, 50) if latencias else float('nan'),
+        'p95_s': np.percentile(latencias, 95) if latencias else float('nan'),
+        'max_s': max(latencias, default=float('nan')),
+        'cpu_%': 100 * (time.process_time() - cpu_inicio) / duracao,
+        'rss_base_mb': rss_base,
+        'rss_pico_mb': rss_pico,
+        'rss_por_sessao_mb': (rss_pico - rss_base) / sessoes,
+    }
+
+# --------------------------
+# Execução
+# --------------------------
+
+def executar_processo(sessoes, nomes, args):
+    """Mede um nível num processo novo: uma sessão de aquecimento (partida a frio) e depois o nível."""
+    frio = executar_nivel(1, nomes, args.acoes, args.dias, args.seed, args.timeout)
+    preparar_sessoes_simultaneas()
+    nivel = executar_nivel(sessoes, nomes, args.acoes, args.dias, args.seed + 1, args.timeout)
+    return {'frio': frio, 'nivel': nivel}
+
+def medir_em_subprocesso(sessoes, args):
+    """Executa o nível num subprocesso deste script e retorna as medições da partida a frio e do nível."""
+    comando = [sys.executable, os.path.abspath(__file__), '--nivel', str(sessoes),
+               '--nomes', str(args.nomes), '--dias', str(args.dias), '--acoes', str(args.acoes),
+               '--seed', str(args.seed), '--timeout', str(args.timeout)]
+    processo = subprocess.run(comando, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, check=True)
+    linhas = processo.stdout.splitlines()
+    for linha in linhas[:-1]:
+        print(linha)
+    return json.loads(linhas[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga do Dashboard FITec com sessões simultâneas.")
+    parser.add_argument('--sessoes', type=int, nargs='+', default=[1, 5, 10], help="Números de sessões simultâneas a testar.")
+    parser.add_argument('--linhas', type=int, default=50_000, help="Linhas do CSV sintético.")
+    parser.add_argument('--nomes', type=int, default=20, help="Quantidade de operadores no CSV sintético.")
+    parser.add_argument('--dias', type=int, default=90, help="Período coberto pelos dados sintéticos, em dias.")
+    parser.add_argument('--acoes', type=int, default=10, help="Interações aleatórias por sessão após o login.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=120, help="Tempo máximo de cada rerun, em segundos.")
+    parser.add_argument('--nivel', type=int, help=argparse.SUPPRESS)  # Uso interno: mede um nível neste processo
+    args = parser.parse_args()
+    os.chdir(os.path.dirname(APP))  # O app lê styles.css, FITec.svg e as camadas de forma relativa
+
+    if args.nivel is not None:
+        nomes = sorted(pd.read_csv(os.environ["FITEC_CSV_LOCAL"], sep=';', usecols=['Nome'])['Nome'].unique())
+        print(json.dumps(executar_processo(args.nivel, nomes, args)))
+        return
+
+    with tempfile.TemporaryDirectory() as pasta:
+        caminho = os.path.join(pasta, "dados.csv")
+        gerar_dados_sinteticos(caminho, args.linhas, args.nomes, args.dias, args.seed)
+        os.environ["FITEC_CSV_URL"] = caminho
+        os.environ["FITEC_CSV_LOCAL"] = caminho
+
+        print(f"Dados sintéticos: {args.linhas} linhas, {args.nomes} operadores, {args.dias} dias")
+        frio, resultados = None, []
+        for sessoes in args.sessoes:
+            print(f"Executando {sessoes} sessão(ões) simultânea(s) num processo novo...")
+            medicao = medir_em_subprocesso(sessoes, args)
+            frio = frio or dict(medicao['frio'], fase='partida a frio')
+            resultados.append(dict(medicao['nivel'], fase='aquecido'))
+
+    print()
+    tabela = pd.DataFrame([frio] + resultados)
+    print(tabela[['fase'] + [coluna for coluna in tabela.columns if coluna != 'fase']].round(3).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
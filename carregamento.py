@@ -0,0 +1,97 @@
+import streamlit as st
+import pandas as pd
+import threading
+import time
+import concurrent.futures
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+# --------------------------
+# Carregamento Paralelo das Fontes
+# --------------------------
+
+def _executar_cronometrado(carregar, tempos, nome):
+    """Executa a função de carregamento, registrando o tempo gasto em segundos mesmo se ela falhar."""
+    inicio = time.perf_counter()
+    try:
+        return carregar()
+    finally:
+        tempos[nome] = time.perf_counter() - inicio
+
+def _sem_dados(resultado):
+    """Indica se o carregamento não trouxe dados (os carregadores tratam seus erros e retornam vazio)."""
+    if isinstance(resultado, tuple):
+        resultado = resultado[0] if resultado else None
+    if resultado is None:
+        return True
+    if isinstance(resultado, pd.DataFrame):
+        return resultado.empty
+    return len(resultado) == 0
+
+def carregar_fontes(fontes, max_workers=None):
+    """Carrega fontes independentes em paralelo numa pool de threads.
+
+    `fontes` é um dicionário {nome: função sem argumentos}. Retorna três dicionários:
+    resultados, tempos (segundos) e erros. Uma fonte que falha ou retorna vazio não interrompe
+    as demais; a falha fica registrada em erros.
+    """
+    ctx = get_script_run_ctx()
+
+    def _inicializar():
+        # Permite que as funções de carregamento usem st.cache_data e mensagens do Streamlit
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    resultados, tempos, erros = {}, {}, {}
+    inicio = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers or len(fontes),
+                                               initializer=_inicializar) as executor:
+        futuros = {executor.submit(_executar_cronometrado, carregar, tempos, nome): nome
+                   for nome, carregar in fontes.items()}
+        for futuro in concurrent.futures.as_completed(futuros):
+            nome = futuros[futuro]
+            try:
+                resultados[nome] = futuro.result()
+            except Exception as e:
+                resultados[nome] = None
+                erros[nome] = e
+                continue
+            if _sem_dados(resultados[nome]):
+                erros[nome] = ValueError("a fonte não retornou dados")
+    tempos['total'] = time.perf_counter() - inicio
+    return resultados, tempos, erros
+
+def registrar_primeira_carga(fontes, tempos, erros):
+    """Guarda na sessão os tempos e falhas da primeira carga de cada fonte e retorna os registrados.
+
+    Nos reruns seguintes as fontes vêm do cache e levam milissegundos; sem o registro, a tabela
+    passaria a mostrar esses tempos em vez do custo real da carga. A chave inclui a função de
+    carregamento, então trocar o carregador de uma fonte (ex.: modo agregado) registra uma nova carga.
+    Uma fonte que falhou é registrada de novo quando voltar a carregar.
+    """
+    registro = st.session_state.setdefault('tempos_carga', {'tempos': {}, 'erros': {}, 'carregadores': {}})
+    nova_carga = False
+    for nome, carregar in fontes.items():
+        if registro['carregadores'].get(nome) == carregar.__name__ and (nome in erros or nome not in registro['erros']):
+            continue
+        registro['carregadores'][nome] = carregar.__name__
+        registro['tempos'][nome] = tempos[nome]
+        if nome in erros:
+            registro['erros'][nome] = erros[nome]
+        else:
+            registro['erros'].pop(nome, None)
+        nova_carga = True
+    if nova_carga:
+        registro['tempos']['total'] = tempos['total']
+    tempos_registrados = {nome: registro['tempos'][nome] for nome in list(fontes) + ['total']}
+    return tempos_registrados, dict(registro['erros'])
+
+def exibir_tempos(tempos, erros):
+    """Exibe na barra lateral o tempo de carregamento de cada fonte e as falhas ocorridas."""
+    with st.sidebar.expander("⏱️ Tempo de Carregamento"):
+        tabela = pd.DataFrame({
+            'fonte': list(tempos),
+            'segundos': [round(t, 3) for t in tempos.values()],
+            'status': ['falhou' if nome in erros else 'ok' for nome in tempos],
+        })
+        st.dataframe(tabela, use_container_width=True, hide_index=True)
+        for nome, erro in erros.items():
+            st.warning(f"Falha ao carregar '{nome}': {erro}")
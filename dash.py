@@ -2,27 +2,19 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import hashlib
-import unicodedata
-from datetime import datetime
+from datetime import datetime, timedelta
 import numpy as np
 import concurrent.futures
 from sklearn.linear_model import LinearRegression
 import requests
+from auxiliares import normalize_column_names
+from agregados import agregar_fonte, carregar_detalhe
+from cache_graficos import figura_em_cache
 
 # --------------------------
 # Funções Auxiliares
 # --------------------------
 
-def remove_accents(input_str):
-    """Remove acentos de uma string."""
-    nfkd_form = unicodedata.normalize('NFKD', input_str)
-    return ''.join([c for c in nfkd_form if not unicodedata.combining(c)])
-
-def normalize_column_names(df):
-    """Remove acentos e converte os nomes das colunas para minúsculas."""
-    df.columns = [remove_accents(col).strip().lower().replace(' ', '_') for col in df.columns]
-    return df
-
 def hash_password(password):
     """Gera um hash SHA-256 para a senha."""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -67,6 +59,17 @@ def load_and_clean_data(csv_url):
     df = df.dropna(subset=['data'])  # Remover linhas com datas inválidas
     return df
 
+@st.cache_data
+def load_aggregated_data(csv_url):
+    """Carregar os dados em modo agregado, lendo o CSV em blocos e mantendo apenas o cubo diário por nome e cidade."""
+    resultado = agregar_fonte(csv_url, ['utf-8'])
+    return resultado['cubo'], resultado['encoding']
+
+@st.cache_data(max_entries=20)
+def load_raw_records(csv_url, encoding, inicio, fim, nomes):
+    """Buscar registros brutos de uma janela de datas e nomes diretamente na fonte."""
+    return carregar_detalhe(csv_url, encoding, inicio, fim, list(nomes))
+
 @st.cache_data
 def calculate_basic_stats(df):
     """Calcula estatísticas básicas com cache."""
@@ -90,13 +93,17 @@ def display_chart(df):
     st.header('📊 Evolução do Número de Pontos ao Longo do Tempo (Suavizado)')
     st.markdown("---")
 
-    df['numero_de_pontos_smooth'] = df['numero_de_pontos'].rolling(window=7, min_periods=1).mean()
+    fig = figura_em_cache(df, 'evolucao_pontos_dash', lambda: build_chart_figure(df))
+    st.plotly_chart(fig, use_container_width=True)
+
+def build_chart_figure(df):
+    """Constrói o gráfico do número de pontos suavizado com uma média móvel de 7 dias."""
+    df = df.assign(numero_de_pontos_smooth=df['numero_de_pontos'].rolling(window=7, min_periods=1).mean())
 
     fig = px.line(df, x='data', y='numero_de_pontos_smooth', markers=True, title="Evolução do Número de Pontos (Suavização: 7 dias)", template='plotly_white')
     fig.update_layout(xaxis_title="Data", yaxis_title="Número de Pontos Suavizado", hovermode="x unified", 
                       plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font_color=set_text_color())
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 def display_basic_stats(df):
     """Exibe um resumo estatístico básico dos dados filtrados, incluindo indicadores de meta."""
@@ -183,9 +190,10 @@ def fetch_external_data(api_url):
         st.error("Erro ao consultar a API.")
         return {}
 
+@st.cache_data(max_entries=20)
 def predict_points(df):
-    """Previsão simples usando regressão linear."""
-    df['dias'] = (df['data'] - df['data'].min()).dt.days
+    """Previsão simples usando regressão linear (com cache)."""
+    df = df.assign(dias=(df['data'] - df['data'].min()).dt.days)
     X = df['dias'].values.reshape(-1, 1)
     y = df['numero_de_pontos'].values
 
@@ -197,6 +205,39 @@ def predict_points(df):
     
     return dias_futuros.flatten(), pred_pontos
 
+# --------------------------
+# Seções Interativas
+# --------------------------
+# O slider de crescimento e a busca de registros brutos ficam dentro de st.fragment: ao usá-los,
+# apenas a própria seção é reexecutada, sem refazer gráficos, estatísticas e a previsão (que não
+# tem controles e é uma função comum, com cache).
+
+@st.fragment
+def secao_cenarios(df):
+    """Simulações de cenários com taxa de crescimento ajustável."""
+    growth_rate = st.slider('Taxa de Crescimento Diária (%)', min_value=0.0, max_value=10.0, value=2.0)
+    projected_points = calculate_scenarios(df, growth_rate)
+    st.write(f"Projeção de pontos com {growth_rate}% de crescimento: {projected_points:,.2f}")
+
+def secao_projecao(df):
+    """Análises previsionais (Machine Learning)."""
+    dias_futuros, pred_pontos = predict_points(df)
+    st.line_chart({"Dias Futuros": dias_futuros, "Previsão de Pontos": pred_pontos})
+
+@st.fragment
+def secao_registros_brutos(csv_url, encoding, ultima_data, selected_names):
+    """Registros brutos buscados sob demanda na fonte, no modo agregado."""
+    with st.expander("🔎 Registros Brutos (sob demanda)"):
+        col1, col2 = st.columns(2)
+        detalhe_inicio = col1.date_input('Início da Janela', ultima_data - timedelta(days=1), key="detalhe_inicio")
+        detalhe_fim = col2.date_input('Fim da Janela', ultima_data, key="detalhe_fim")
+        if st.button("Buscar registros"):
+            raw_df = load_raw_records(csv_url, encoding, detalhe_inicio, detalhe_fim, tuple(selected_names))
+            if raw_df.empty:
+                st.warning("Nenhum registro encontrado na janela selecionada.")
+            else:
+                st.dataframe(raw_df, use_container_width=True)
+
 # --------------------------
 # Configuração da Página
 # --------------------------
@@ -253,10 +294,17 @@ else:
     # Exibe logotipo na página principal também
     st.image(logo_url, width=150, use_column_width=False)
     
+    # Modo agregado: o CSV é lido em blocos e só o cubo diário fica na memória
+    modo_agregado = st.sidebar.checkbox("Modo agregado (arquivos grandes)", value=False,
+                                        help="Lê o CSV em blocos e mantém apenas os totais diários por nome e cidade.")
+
     # Carregar os dados (com cache)
     with st.spinner('Carregando dados...'):
         csv_url = "https://raw.githubusercontent.com/Tiagofholanda/Dashboard_FITec/main/data/dados.csv"
-        data_df = load_and_clean_data(csv_url)
+        if modo_agregado:
+            data_df, encoding_dados = load_aggregated_data(csv_url)
+        else:
+            data_df = load_and_clean_data(csv_url)
 
     if not data_df.empty:
         # ---- Adicionar Filtro por Múltiplos Nomes ----
@@ -289,13 +337,14 @@ else:
             check_goal_status(total_pontos, meta)
 
             # Simulações de Cenários
-            growth_rate = st.slider('Taxa de Crescimento Diária (%)', min_value=0.0, max_value=10.0, value=2.0)
-            projected_points = calculate_scenarios(filtered_df, growth_rate)
-            st.write(f"Projeção de pontos com {growth_rate}% de crescimento: {projected_points:,.2f}")
+            secao_cenarios(filtered_df)
 
             # Análises Previsionais (Machine Learning)
-            dias_futuros, pred_pontos = predict_points(filtered_df)
-            st.line_chart({"Dias Futuros": dias_futuros, "Previsão de Pontos": pred_pontos})
+            secao_projecao(filtered_df)
+
+            # Registros brutos sob demanda (o modo agregado não mantém as linhas originais)
+            if modo_agregado:
+                secao_registros_brutos(csv_url, encoding_dados, data_df['data'].max().date(), selected_names)
 
             # Conversão do DataFrame para CSV
             def convert_df(df):
@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from cache_graficos import figura_em_cache
 
 # Função para carregar os dados do arquivo Excel a partir do GitHub
 @st.cache_data
@@ -15,6 +16,13 @@ def carregar_dados_desempenho():
         st.error(f"Erro ao carregar o arquivo Excel: {e}")
         return pd.DataFrame()
 
+# Função para construir o gráfico de desempenho diário
+def build_desempenho_figure(desempenho_diario):
+    return px.line(desempenho_diario, x='data', y='número de pontos', 
+                   title="Desempenho Diário - Total de Pontos por Dia",
+                   labels={"número de pontos": "Pontos Diários", "data": "Data"},
+                   markers=True)
+
 # Função para exibir a página de Desempenho
 def show_desempenho():
     st.title("📊 Desempenho Atual")
@@ -68,10 +76,7 @@ def show_desempenho():
     # Gráfico de desempenho diário (opcional, para visualizar o progresso por dia)
     st.subheader("Desempenho Diário de Pontos")
     desempenho_diario = dados.groupby(dados['data'].dt.date)['número de pontos'].sum().reset_index()
-    fig = px.line(desempenho_diario, x='data', y='número de pontos', 
-                  title="Desempenho Diário - Total de Pontos por Dia",
-                  labels={"número de pontos": "Pontos Diários", "data": "Data"},
-                  markers=True)
+    fig = figura_em_cache(desempenho_diario, 'desempenho_diario', lambda: build_desempenho_figure(desempenho_diario))
     st.plotly_chart(fig)
 
     # Botão para download dos dados de desempenho diário
@@ -1 +1,243 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import pydeck as pdk
+import shapefile
+import hashlib
+import os
+import glob
+import re
+import tempfile
+import zipfile
 
+# --------------------------
+# Configurações
+# --------------------------
+
+PASTA_CAMADAS = "data"
+PASTA_PIRAMIDE = os.path.join("data", ".piramide")  # Pirâmides pré-calculadas (não versionadas)
+ZOOM_MIN = 4
+ZOOM_MAX = 14  # Último nível agregado; acima dele são enviadas as feições individuais
+BITS_CELULA = 6  # Cada tile de 256 px é dividido em 2^6 x 2^6 células (4 px por célula)
+LARGURA_VISTA = 1200  # Tamanho aproximado do mapa em pixels, usado para calcular o viewport
+ALTURA_VISTA = 600
+
+# --------------------------
+# Funções Auxiliares
+# --------------------------
+
+def listar_camadas(pasta=PASTA_CAMADAS):
+    """Lista os shapefiles datados da pasta de dados, do mais recente ao mais antigo."""
+    return sorted(glob.glob(os.path.join(pasta, "*.shp")), reverse=True)
+
+def versao_camada(caminho):
+    """Gera um identificador da versão da camada a partir do tamanho e da data de modificação dos arquivos."""
+    base = os.path.splitext(caminho)[0]
+    assinatura = []
+    for extensao in ('.shp', '.dbf'):
+        info = os.stat(base + extensao)
+        assinatura.append(f"{info.st_size}-{info.st_mtime_ns}")
+    return hashlib.sha256('|'.join(assinatura).encode()).hexdigest()[:16]
+
+def _encoding_camada(caminho):
+    """Lê o encoding declarado no arquivo .cpg da camada (padrão: UTF-8)."""
+    try:
+        with open(os.path.splitext(caminho)[0] + '.cpg') as f:
+            return f.read().strip() or 'utf-8'
+    except FileNotFoundError:
+        return 'utf-8'
+
+def ler_camada(caminho):
+    """Lê as feições pontuais da camada com coordenadas e os atributos TIP_PN, DIST e COD_ID."""
+    with shapefile.Reader(caminho, encoding=_encoding_camada(caminho)) as leitor:
+        pontos = [forma.points[0] if forma.points else (np.nan, np.nan) for forma in leitor.iterShapes()]
+        registros = [registro.as_dict() for registro in leitor.iterRecords(fields=['TIP_PN', 'DIST', 'COD_ID'])]
+    feicoes = pd.DataFrame(registros).rename(columns={'TIP_PN': 'tip_pn', 'DIST': 'dist', 'COD_ID': 'cod_id'})
+    feicoes[['lon', 'lat']] = pd.DataFrame(pontos, columns=['lon', 'lat'], dtype=float)
+    return feicoes.dropna(subset=['lon', 'lat'])
+
+def _mercator(lon, lat):
+    """Converte lon/lat para coordenadas Web Mercator normalizadas no intervalo [0, 1]."""
+    lat = np.clip(np.radians(lat), -1.4844, 1.4844)
+    x = (np.asarray(lon) + 180.0) / 360.0
+    y = (1.0 - np.log(np.tan(lat) + 1.0 / np.cos(lat)) / np.pi) / 2.0
+    return x, y
+
+def _mercator_inversa(x, y):
+    """Converte coordenadas Web Mercator normalizadas de volta para lon/lat."""
+    lon = x * 360.0 - 180.0
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1.0 - 2.0 * y))))
+    return lon, lat
+
+# --------------------------
+# Pirâmide de Agregação
+# --------------------------
+
+def construir_piramide(feicoes):
+    """Agrega as feições em grades de células por nível de zoom, contando por TIP_PN e DIST.
+
+    Retorna um dicionário de arrays numpy, pronto para ser gravado com np.savez_compressed.
+    """
+    # Valores nulos viram categorias próprias; o código -1 do factorize indexaria a última categoria
+    tip_pn = feicoes['tip_pn'].replace('', np.nan).fillna('Não informado')
+    tip_codigos, tip_categorias = pd.factorize(tip_pn, sort=True)
+    dist_codigos, dist_categorias = pd.factorize(pd.to_numeric(feicoes['dist'], errors='coerce'),
+                                                 sort=True, use_na_sentinel=False)
+    x, y = _mercator(feicoes['lon'].to_numpy(), feicoes['lat'].to_numpy())
+
+    piramide = {
+        'tip_categorias': np.asarray(tip_categorias, dtype=str),
+        'dist_categorias': np.asarray(dist_categorias, dtype=np.float64),  # NaN = DIST não informado
+        'feicoes_lon': feicoes['lon'].to_numpy(dtype=np.float64),
+        'feicoes_lat': feicoes['lat'].to_numpy(dtype=np.float64),
+        'feicoes_tip': tip_codigos.astype(np.int16),
+        'feicoes_dist': dist_codigos.astype(np.int16),
+        'feicoes_cod_id': feicoes['cod_id'].to_numpy(dtype=str),
+    }
+    for zoom in range(ZOOM_MIN, ZOOM_MAX + 1):
+        celulas = 2 ** (zoom + BITS_CELULA)
+        nivel = pd.DataFrame({
+            'ix': np.minimum((x * celulas).astype(np.int64), celulas - 1),
+            'iy': np.minimum((y * celulas).astype(np.int64), celulas - 1),
+            'tip': tip_codigos,
+            'dist': dist_codigos,
+        }).value_counts().reset_index(name='contagem')
+        piramide[f'z{zoom}_ix'] = nivel['ix'].to_numpy(dtype=np.int32)
+        piramide[f'z{zoom}_iy'] = nivel['iy'].to_numpy(dtype=np.int32)
+        piramide[f'z{zoom}_tip'] = nivel['tip'].to_numpy(dtype=np.int16)
+        piramide[f'z{zoom}_dist'] = nivel['dist'].to_numpy(dtype=np.int16)
+        piramide[f'z{zoom}_contagem'] = nivel['contagem'].to_numpy(dtype=np.int32)
+    return piramide
+
+def _ler_piramide(arquivo):
+    """Lê a pirâmide salva em disco; retorna None se o arquivo não existir ou estiver corrompido."""
+    try:
+        with np.load(arquivo) as dados:
+            return {chave: dados[chave] for chave in dados.files}
+    except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+        return None
+
+def _salvar_piramide(arquivo, piramide):
+    """Grava a pirâmide num arquivo temporário e o move para o destino, para nunca deixar um .npz pela metade."""
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(arquivo), suffix='.tmp', delete=False) as temporario:
+        try:
+            np.savez_compressed(temporario, **piramide)
+        except BaseException:
+            temporario.close()
+            os.remove(temporario.name)
+            raise
+    os.replace(temporario.name, arquivo)
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def carregar_piramide(caminho, versao):
+    """Carrega a pirâmide da camada a partir do disco, construindo-a apenas uma vez por versão da camada."""
+    nome = os.path.splitext(os.path.basename(caminho))[0]
+    arquivo = os.path.join(PASTA_PIRAMIDE, f"{nome}-{versao}.npz")
+    piramide = _ler_piramide(arquivo)
+    if piramide is not None:
+        return piramide
+
+    # Arquivo ausente ou corrompido: reconstrói a pirâmide e a regrava
+    piramide = construir_piramide(ler_camada(caminho))
+    os.makedirs(PASTA_PIRAMIDE, exist_ok=True)
+    _salvar_piramide(arquivo, piramide)
+
+    # Remove as pirâmides de versões anteriores desta camada (nome-<versão>.npz, e não outras camadas com o mesmo prefixo)
+    padrao = re.compile(rf"{re.escape(nome)}-[0-9a-f]{{16}}\.npz")
+    for antigo in os.listdir(PASTA_PIRAMIDE):
+        if padrao.fullmatch(antigo) and os.path.join(PASTA_PIRAMIDE, antigo) != arquivo:
+            os.remove(os.path.join(PASTA_PIRAMIDE, antigo))
+    return piramide
+
+def carregar_camadas():
+    """Carrega (ou constrói) as pirâmides de todas as camadas disponíveis."""
+    return {caminho: carregar_piramide(caminho, versao_camada(caminho)) for caminho in listar_camadas()}
+
+def calcular_viewport(lon, lat, zoom, largura=LARGURA_VISTA, altura=ALTURA_VISTA):
+    """Calcula os limites (lon_min, lat_min, lon_max, lat_max) visíveis para um centro e zoom."""
+    x, y = _mercator(lon, lat)
+    meia_largura = largura / (256.0 * 2 ** zoom) / 2
+    meia_altura = altura / (256.0 * 2 ** zoom) / 2
+    lon_min, lat_max = _mercator_inversa(x - meia_largura, max(y - meia_altura, 0.0))
+    lon_max, lat_min = _mercator_inversa(x + meia_largura, min(y + meia_altura, 1.0))
+    return float(lon_min), float(lat_min), float(lon_max), float(lat_max)
+
+def consultar_viewport(piramide, viewport, zoom):
+    """Retorna os dados visíveis no viewport: células agregadas até ZOOM_MAX e feições individuais acima dele."""
+    lon_min, lat_min, lon_max, lat_max = viewport
+    tip_categorias = piramide['tip_categorias']
+    dist_categorias = piramide['dist_categorias']
+
+    if zoom > ZOOM_MAX:
+        lon, lat = piramide['feicoes_lon'], piramide['feicoes_lat']
+        visiveis = (lon >= lon_min) & (lon <= lon_max) & (lat >= lat_min) & (lat <= lat_max)
+        return pd.DataFrame({
+            'lon': lon[visiveis],
+            'lat': lat[visiveis],
+            'tip_pn': tip_categorias[piramide['feicoes_tip'][visiveis]],
+            'dist': dist_categorias[piramide['feicoes_dist'][visiveis]],
+            'cod_id': piramide['feicoes_cod_id'][visiveis],
+            'contagem': 1,
+        })
+
+    nivel = int(np.clip(zoom, ZOOM_MIN, ZOOM_MAX))
+    celulas = 2 ** (nivel + BITS_CELULA)
+    x_min, y_min = _mercator(lon_min, lat_max)
+    x_max, y_max = _mercator(lon_max, lat_min)
+    ix, iy = piramide[f'z{nivel}_ix'], piramide[f'z{nivel}_iy']
+    visiveis = ((ix >= int(x_min * celulas)) & (ix <= int(x_max * celulas))
+                & (iy >= int(y_min * celulas)) & (iy <= int(y_max * celulas)))
+    lon, lat = _mercator_inversa((ix[visiveis] + 0.5) / celulas, (iy[visiveis] + 0.5) / celulas)
+    return pd.DataFrame({
+        'lon': lon,
+        'lat': lat,
+        'tip_pn': tip_categorias[piramide[f'z{nivel}_tip'][visiveis]],
+        'dist': dist_categorias[piramide[f'z{nivel}_dist'][visiveis]],
+        'contagem': piramide[f'z{nivel}_contagem'][visiveis],
+    })
+
+# --------------------------
+# Função de Exibição
+# --------------------------
+
+@st.fragment
+def show_mapa(camadas):
+    """Exibe a camada de levantamento, enviando ao navegador apenas o que está visível no zoom escolhido."""
+    st.subheader("🗺️ Mapa do Levantamento")
+    if not camadas:
+        st.warning("Nenhuma camada de levantamento foi encontrada.")
+        return
+
+    caminho = st.selectbox("Camada", list(camadas), format_func=lambda c: os.path.splitext(os.path.basename(c))[0])
+    piramide = camadas[caminho]
+    if len(piramide['feicoes_lon']) == 0:
+        st.warning("A camada selecionada não possui feições.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    zoom = col1.slider("Zoom", min_value=ZOOM_MIN, max_value=ZOOM_MAX + 4, value=9)
+    lon = col2.number_input("Longitude do Centro", value=float(np.median(piramide['feicoes_lon'])), format="%.5f")
+    lat = col3.number_input("Latitude do Centro", value=float(np.median(piramide['feicoes_lat'])), format="%.5f")
+
+    visiveis = consultar_viewport(piramide, calcular_viewport(lon, lat, zoom), zoom)
+    if visiveis.empty:
+        st.info("Nenhuma feição na área visível.")
+        return
+
+    if zoom > ZOOM_MAX:
+        camada = pdk.Layer("ScatterplotLayer", visiveis, get_position=['lon', 'lat'], get_radius=4,
+                           radius_units='pixels', get_fill_color=[76, 175, 80], pickable=True)
+        tooltip = {"text": "{cod_id}\nTIP_PN: {tip_pn}\nDIST: {dist}"}
+    else:
+        celulas = visiveis.groupby(['lon', 'lat'], as_index=False)['contagem'].sum()
+        celulas['raio'] = np.sqrt(celulas['contagem']) * 3
+        camada = pdk.Layer("ScatterplotLayer", celulas, get_position=['lon', 'lat'], get_radius='raio',
+                           radius_units='pixels', get_fill_color=[76, 175, 80, 160], pickable=True)
+        tooltip = {"text": "{contagem} feições"}
+
+    st.pydeck_chart(pdk.Deck(layers=[camada], tooltip=tooltip, map_style=None,
+                             initial_view_state=pdk.ViewState(longitude=lon, latitude=lat, zoom=zoom)))
+
+    st.write("**Feições Visíveis por TIP_PN e DIST**")
+    resumo = visiveis.groupby(['tip_pn', 'dist'], as_index=False, dropna=False)['contagem'].sum()
+    st.dataframe(resumo.sort_values('contagem', ascending=False), use_container_width=True, hide_index=True)
@@ -0,0 +1,104 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.express as px
+from auxiliares import versao_dados
+from agregados import CHAVES_CUBO, eh_cubo, montar_cubo
+
+# --------------------------
+# Configurações
+# --------------------------
+
+SOMAS = ['pontos', 'hh', 'pontos_com_hh']  # Pontos por H/H usa pontos_com_hh, que ignora linhas sem H/H
+
+# --------------------------
+# Funções Auxiliares
+# --------------------------
+
+def _razao(numerador, denominador):
+    """Divide duas séries evitando divisão por zero (resultado NaN)."""
+    return numerador / denominador.replace(0, np.nan)
+
+# --------------------------
+# Motor de Produtividade
+# --------------------------
+
+def preparar_cubo(df):
+    """Reaproveita o cubo do modo agregado ou o monta a partir dos registros, com pontos e H/H."""
+    cubo = df if eh_cubo(df) else montar_cubo(df).reset_index()
+    return cubo.rename(columns={'numero_de_pontos': 'pontos', 'h/h': 'hh'})[CHAVES_CUBO + SOMAS]
+
+def _resumo(cubo, chave):
+    """Resume o cubo por uma dimensão, calculando pontos por H/H e por imagem."""
+    grupos = cubo.groupby(chave)
+    resumo = grupos[SOMAS].sum(min_count=1).join(grupos.agg(
+        imagens=('imagem', 'nunique'),
+        dias=('data', 'nunique'),
+        operadores=('nome', 'nunique'),
+    ))
+    resumo['pontos_por_hh'] = _razao(resumo['pontos_com_hh'], resumo['hh'])
+    resumo['pontos_por_imagem'] = _razao(resumo['pontos'], resumo['imagens'])
+    return resumo.sort_values('pontos', ascending=False).reset_index()
+
+def _taxa_movel(cubo, janela):
+    """Calcula a taxa móvel de pontos por H/H de cada operador numa janela de dias corridos."""
+    diario = cubo.groupby(['nome', 'data'], as_index=False)[SOMAS].sum(min_count=1)
+    movel = (
+        diario.set_index('data')
+        .groupby('nome')[SOMAS]
+        .rolling(f'{janela}D')
+        .sum()
+        .reset_index()
+    )
+    movel['pontos_por_hh_movel'] = _razao(movel['pontos_com_hh'], movel['hh'])
+    return movel
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def calcular_produtividade(_df, versao, janela=7):
+    """Calcula pontos por H/H, por imagem, por cidade e a taxa móvel por operador (cache por versão dos dados)."""
+    cubo = preparar_cubo(_df)
+    return {
+        'por_operador': _resumo(cubo, 'nome').drop(columns='operadores'),
+        'por_cidade': _resumo(cubo, 'cidade'),
+        'por_imagem': _resumo(cubo, 'imagem').drop(columns='imagens'),
+        'taxa_movel': _taxa_movel(cubo, janela),
+    }
+
+# --------------------------
+# Função de Exibição
+# --------------------------
+
+def show_produtividade(df, janela=7):
+    """Exibe os indicadores de produtividade dos operadores."""
+    st.subheader("⏱️ Produtividade dos Operadores")
+
+    if 'h/h' not in df.columns or 'numero_de_pontos' not in df.columns:
+        st.warning("As colunas 'H/H' e 'número de pontos' são necessárias para calcular a produtividade.")
+        return
+
+    resultado = calcular_produtividade(df, versao_dados(df), janela)
+    por_operador = resultado['por_operador']
+
+    total_pontos_com_hh = por_operador['pontos_com_hh'].sum()
+    total_hh = por_operador['hh'].sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Total de H/H", f"{total_hh:,.1f}")
+    col2.metric("Pontos por H/H", f"{total_pontos_com_hh / total_hh:,.2f}" if total_hh > 0 else "-")
+    col3.metric("Operadores", len(por_operador))
+
+    st.write("**Por Operador**")
+    st.dataframe(por_operador, use_container_width=True, hide_index=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Por Cidade**")
+        st.dataframe(resultado['por_cidade'], use_container_width=True, hide_index=True)
+    with col2:
+        st.write("**Por Imagem**")
+        st.dataframe(resultado['por_imagem'], use_container_width=True, hide_index=True)
+
+    fig = px.line(resultado['taxa_movel'], x='data', y='pontos_por_hh_movel', color='nome', markers=True,
+                  title=f"Pontos por H/H (Janela Móvel: {janela} dias)", template='ggplot2',
+                  labels={"pontos_por_hh_movel": "Pontos por H/H", "data": "Data", "nome": "Operador"})
+    fig.update_layout(hovermode="x unified", plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+    st.plotly_chart(fig, use_container_width=True, key="chart_produtividade")
@@ -1,6 +1,25 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from cache_graficos import figura_em_cache
+
+def build_projecao_figure(dados):
+    """Constrói o gráfico de projeção de pontos ao longo do tempo."""
+    fig = px.line(dados, x='data', y='pontos_projetados', 
+                  title="Projeção de Pontos ao Longo do Tempo",
+                  labels={"pontos_projetados": "Pontos Projetados", "data": "Data"},
+                  markers=True)
+    fig.update_layout(
+        title_font=dict(size=22, color='DarkBlue'),
+        xaxis_title="Data",
+        yaxis_title="Pontos Projetados",
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        paper_bgcolor='rgba(0, 0, 0, 0)',
+        xaxis=dict(showgrid=False),
+        yaxis=dict(showgrid=True),
+        font=dict(family="Arial", size=14)
+    )
+    return fig
 
 def show_projecao():
     st.title("📈 Projeção de Metas")
@@ -27,21 +46,8 @@ def show_projecao():
 
     st.subheader(f"Ainda faltam {pontos_faltantes:.0f} pontos para atingir a meta.")
 
-    # Gráfico de projeção
-    fig = px.line(dados, x='data', y='pontos_projetados', 
-                  title="Projeção de Pontos ao Longo do Tempo",
-                  labels={"pontos_projetados": "Pontos Projetados", "data": "Data"},
-                  markers=True)
-    fig.update_layout(
-        title_font=dict(size=22, color='DarkBlue'),
-        xaxis_title="Data",
-        yaxis_title="Pontos Projetados",
-        plot_bgcolor='rgba(0, 0, 0, 0)',
-        paper_bgcolor='rgba(0, 0, 0, 0)',
-        xaxis=dict(showgrid=False),
-        yaxis=dict(showgrid=True),
-        font=dict(family="Arial", size=14)
-    )
+    # Gráfico de projeção (com cache)
+    fig = figura_em_cache(dados, 'projecao', lambda: build_projecao_figure(dados))
     st.plotly_chart(fig)
 
     # Adiciona o botão para baixar os dados
@@ -2,24 +2,21 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import hashlib
-import unicodedata
+import os
 from datetime import datetime, timedelta
 import numpy as np
+from auxiliares import normalize_column_names, converter_datas
+from produtividade import show_produtividade
+from agregados import agregar_fonte, carregar_detalhe
+from carregamento import carregar_fontes, exibir_tempos, registrar_primeira_carga
+from desempenho import carregar_dados_desempenho
+from mapa import carregar_camadas, show_mapa
+from cache_graficos import figura_em_cache, exibir_estatisticas_cache
 
 # --------------------------
 # Funções Auxiliares
 # --------------------------
 
-def remove_accents(input_str):
-    """Remove acentos de uma string."""
-    nfkd_form = unicodedata.normalize('NFKD', input_str)
-    return ''.join([c for c in nfkd_form if not unicodedata.combining(c)])
-
-def normalize_column_names(df):
-    """Remove acentos e converte os nomes das colunas para minúsculas."""
-    df.columns = [remove_accents(col).strip().lower().replace(' ', '_') for col in df.columns]
-    return df
-
 def hash_password(password):
     """Gera um hash SHA-256 para a senha."""
     return hashlib.sha256(password.encode()).hexdigest()
@@ -51,12 +48,17 @@ def set_text_color():
 # Função para Carregar Dados
 # --------------------------
 
+# As variáveis de ambiente permitem apontar para outra fonte (ex.: dados sintéticos do teste de carga)
+CSV_URL = os.environ.get("FITEC_CSV_URL", "https://raw.githubusercontent.com/Tiagofholanda/Dashboard_FITec/main/data/dados.csv")
+LOCAL_FILE_PATH = os.environ.get("FITEC_CSV_LOCAL", "data/dados.csv")  # Fallback para arquivo local
+ENCODINGS = ["utf-8", "ISO-8859-1", "latin1", "windows-1252"]  # Lista de encodings comuns
+
 @st.cache_data
 def get_custom_data():
     """Carregar dados CSV personalizados a partir do link no GitHub ou de um arquivo local, com fallback de encoding."""
-    csv_url = "https://raw.githubusercontent.com/Tiagofholanda/Dashboard_FITec/main/data/dados.csv"
-    local_file_path = "data/dados.csv"  # Fallback para arquivo local
-    encodings = ["utf-8", "ISO-8859-1", "latin1", "windows-1252"]  # Lista de encodings comuns
+    csv_url = CSV_URL
+    local_file_path = LOCAL_FILE_PATH
+    encodings = ENCODINGS
 
     df = None
     # Tentar carregar o arquivo online
@@ -109,6 +111,29 @@ def get_custom_data():
         st.error(f"Erro ao processar o arquivo: {e}")
         return pd.DataFrame()
 
+@st.cache_data
+def get_aggregated_data():
+    """Carregar os dados em modo agregado, lendo o CSV em blocos e mantendo apenas o cubo diário por nome e cidade."""
+    for fonte in (CSV_URL, LOCAL_FILE_PATH):
+        try:
+            resultado = agregar_fonte(fonte, ENCODINGS)
+        except FileNotFoundError:
+            st.error("O arquivo CSV local não foi encontrado.")
+            continue
+        except Exception as e:
+            st.error(f"Erro ao agregar o arquivo {fonte}: {e}")
+            continue
+        st.success(f"{resultado['linhas']} registros agregados em blocos com codificação: {resultado['encoding']}")
+        return resultado['cubo'], fonte, resultado['encoding'], resultado['data_min'], resultado['data_max']
+
+    st.error("Não foi possível agregar o arquivo CSV. Verifique a URL ou o caminho do arquivo local.")
+    return pd.DataFrame(), None, None, None, None
+
+@st.cache_data(max_entries=20)
+def get_raw_records(fonte, encoding, inicio, fim, nomes):
+    """Buscar registros brutos de uma janela de datas e nomes diretamente na fonte."""
+    return carregar_detalhe(fonte, encoding, inicio, fim, list(nomes))
+
 # --------------------------
 # Funções de Estatísticas
 # --------------------------
@@ -186,7 +211,21 @@ def display_basic_stats_daily(df_daily, std_dev):
         return
     st.subheader("📅 Estatísticas Diárias")
     st.write(f"Desvio Padrão dos Pontos Diários: {std_dev:.2f}")
-    st.line_chart(df_daily.set_index('data')['total_pontos'])
+    fig = figura_em_cache(df_daily, 'pontos_diarios', lambda: build_daily_figure(df_daily))
+    st.plotly_chart(fig, use_container_width=True, key="chart_pontos_diarios")
+
+def build_daily_figure(df_daily):
+    """Constrói o gráfico do total de pontos por dia."""
+    fig = px.line(df_daily, x='data', y='total_pontos', template='ggplot2')
+    fig.update_layout(
+        xaxis_title="Data",
+        yaxis_title="Total de Pontos",
+        hovermode="x unified",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font_color=set_text_color()
+    )
+    return fig
 
 def display_goal_projection(dias_necessarios, data_projecao_termino):
     """Exibe projeção de conclusão da meta."""
@@ -197,24 +236,98 @@ def display_goal_projection(dias_necessarios, data_projecao_termino):
         st.write(f"Dias Necessários para Conclusão: {dias_necessarios:.0f}")
         st.write(f"Data Estimada de Conclusão: {data_projecao_termino.strftime('%d/%m/%Y')}")
 
-def display_chart(df, key=None):
-    """Exibe gráfico interativo do número de pontos ao longo do tempo, suavizado com uma média móvel de 7 dias."""
+def display_chart(df, key=None, janela=7):
+    """Exibe gráfico interativo do número de pontos ao longo do tempo, suavizado com uma média móvel (padrão: 7 dias)."""
     if 'numero_de_pontos' not in df.columns or df['numero_de_pontos'].isna().all():
         st.warning("Não há dados suficientes para exibir o gráfico.")
         return
 
-    df['numero_de_pontos_smooth'] = df['numero_de_pontos'].rolling(window=7, min_periods=1).mean()
-    fig = px.line(df, x='data', y='numero_de_pontos_smooth', markers=True, 
-                  title="Evolução do Número de Pontos (Suavização: 7 dias)", template='ggplot2')
+    fig = figura_em_cache(df, 'evolucao_pontos', lambda: build_chart_figure(df, janela), janela=janela)
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+def build_chart_figure(df, janela=7):
+    """Constrói o gráfico do número de pontos suavizado com uma média móvel."""
+    df = df.assign(numero_de_pontos_smooth=df['numero_de_pontos'].rolling(window=janela, min_periods=1).mean())
+    fig = px.line(df, x='data', y='numero_de_pontos_smooth', markers=True,
+                  title=f"Evolução do Número de Pontos (Suavização: {janela} dias)", template='ggplot2')
     fig.update_layout(
-        xaxis_title="Data", 
-        yaxis_title="Número de Pontos Suavizado", 
-        hovermode="x unified", 
-        plot_bgcolor='rgba(0,0,0,0)', 
-        paper_bgcolor='rgba(0,0,0,0)', 
+        xaxis_title="Data",
+        yaxis_title="Número de Pontos Suavizado",
+        hovermode="x unified",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
         font_color=set_text_color()
     )
-    st.plotly_chart(fig, use_container_width=True, key=key)
+    return fig
+
+# --------------------------
+# Seções do Dashboard
+# --------------------------
+# As seções com controles próprios são st.fragment: um controle dentro delas executa apenas
+# a própria seção, sem refazer o carregamento, os filtros e as demais seções. Seções sem
+# controles são funções comuns. As dependências de dados são passadas como argumentos.
+
+def secao_kpis(total_pontos, pontos_restantes, percentual_atingido, total_line_extension_km):
+    """Seção de KPIs no topo do dashboard."""
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Pontos Realizados", total_pontos)
+    col2.metric("Progresso da Meta", f"{percentual_atingido:.2f}%")
+    col3.metric("Pontos Restantes", pontos_restantes)
+    col4.metric("Extensão Total (km)", f"{total_line_extension_km:.2f}")
+
+def secao_visao_geral(filtered_df, df_daily, std_dev, total_pontos, pontos_restantes, percentual_atingido,
+                      dias_necessarios, data_projecao_termino):
+    """Seção de visão geral: progresso, estatísticas diárias, gráfico suavizado e projeção."""
+    col1, col2 = st.columns(2)
+    with col1:
+        display_meta_progress(total_pontos, pontos_restantes, percentual_atingido)
+        display_basic_stats_daily(df_daily, std_dev)
+    with col2:
+        secao_grafico_suavizado(filtered_df)
+        display_goal_projection(dias_necessarios, data_projecao_termino)
+
+@st.fragment
+def secao_grafico_suavizado(filtered_df):
+    """Gráfico suavizado da visão geral; a janela de suavização reexecuta só este gráfico."""
+    janela = st.slider("Janela de Suavização (dias)", min_value=1, max_value=30, value=7, key="janela_visao_geral")
+    display_chart(filtered_df, key="chart_visao_geral", janela=janela)
+
+@st.fragment
+def secao_por_nome(filtered_df, selected_names):
+    """Seção de gráficos por nome; a escolha dos nomes exibidos reexecuta só esta seção."""
+    exibidos = st.multiselect("Nomes Exibidos", selected_names, default=selected_names)
+    for idx, name in enumerate(exibidos):
+        st.subheader(f"Estatísticas de {name}")
+        name_df = filtered_df[filtered_df['nome'] == name]
+        if not name_df.empty:
+            display_chart(name_df, key=f"chart_{name}_{idx}")
+        else:
+            st.warning(f"⚠️ Não foram encontrados dados para {name}.")
+
+def secao_produtividade(filtered_df, controle_df, start_date, end_date, selected_names):
+    """Seção de produtividade dos operadores."""
+    # A planilha de controle traz o H/H; usa-a quando os dados principais não têm a coluna
+    if 'h/h' not in filtered_df.columns and 'h/h' in controle_df.columns:
+        produtividade_df = controle_df[(controle_df['data'] >= start_date) & (controle_df['data'] <= end_date)]
+        if selected_names:
+            produtividade_df = produtividade_df[produtividade_df['nome'].isin(selected_names)]
+        show_produtividade(produtividade_df)
+    else:
+        show_produtividade(filtered_df)
+
+@st.fragment
+def secao_registros_brutos(fonte_dados, encoding_dados, end_date, selected_names):
+    """Seção de registros brutos buscados sob demanda no modo agregado."""
+    with st.expander("🔎 Registros Brutos (sob demanda)"):
+        col1, col2 = st.columns(2)
+        detalhe_inicio = col1.date_input('Início da Janela', end_date - timedelta(days=1), key="detalhe_inicio")
+        detalhe_fim = col2.date_input('Fim da Janela', end_date, key="detalhe_fim")
+        if st.button("Buscar registros"):
+            raw_df = get_raw_records(fonte_dados, encoding_dados, detalhe_inicio, detalhe_fim, tuple(selected_names))
+            if raw_df.empty:
+                st.warning("Nenhum registro encontrado na janela selecionada.")
+            else:
+                st.dataframe(raw_df, use_container_width=True)
 
 # --------------------------
 # Dashboard Principal
@@ -245,14 +358,43 @@ if not st.session_state['login_status']:
                 st.error("Nome de usuário ou senha incorretos")
 else:
     st.image(logo_url, width=150, use_column_width=False)
+    modo_agregado = st.sidebar.checkbox("Modo agregado (arquivos grandes)", value=False,
+                                        help="Lê o CSV em blocos e mantém apenas os totais diários por nome e cidade.")
+    fontes = {
+        'dados': get_aggregated_data if modo_agregado else get_custom_data,
+        'controle': carregar_dados_desempenho,
+        'camadas': carregar_camadas,
+    }
     with st.spinner('Carregando dados...'):
-        data_df = get_custom_data()
+        resultados, tempos, erros = carregar_fontes(fontes)
+    exibir_tempos(*registrar_primeira_carga(fontes, tempos, erros))
+
+    if modo_agregado:
+        data_df, fonte_dados, encoding_dados, data_min, data_max = resultados['dados'] or (pd.DataFrame(), None, None, None, None)
+    else:
+        data_df = resultados['dados'] if resultados['dados'] is not None else pd.DataFrame()
+    camadas = resultados['camadas'] or {}
+    controle_df = resultados['controle'] if resultados['controle'] is not None else pd.DataFrame()
+    if not controle_df.empty and 'data' in controle_df.columns:
+        controle_df = normalize_column_names(controle_df.copy())
+        controle_df['data'] = converter_datas(controle_df['data'])
+        sem_data = controle_df['data'].isna().sum()
+        if sem_data:
+            st.warning(f"⚠️ {sem_data} linha(s) da planilha de controle sem data reconhecida foram descartadas.")
+        controle_df = controle_df.dropna(subset=['data'])
 
     if not data_df.empty:
         unique_names = data_df['nome'].unique().tolist()
         selected_names = st.sidebar.multiselect("Selecione Nome(s)", unique_names, default=unique_names)
-        start_date = st.sidebar.date_input('Data Inicial', datetime.today() - timedelta(days=30))
-        end_date = st.sidebar.date_input('Data Final', datetime.today())
+        if modo_agregado and data_min is not None:
+            # No modo agregado, os limites de data vêm da leitura em blocos
+            limite_inicial, limite_final = data_min.date(), data_max.date()
+            inicio_padrao = max(limite_inicial, limite_final - timedelta(days=30))
+            start_date = st.sidebar.date_input('Data Inicial', inicio_padrao, min_value=limite_inicial, max_value=limite_final)
+            end_date = st.sidebar.date_input('Data Final', limite_final, min_value=limite_inicial, max_value=limite_final)
+        else:
+            start_date = st.sidebar.date_input('Data Inicial', datetime.today() - timedelta(days=30))
+            end_date = st.sidebar.date_input('Data Final', datetime.today())
 
         # Garantir que as datas estão no formato correto
         try:
@@ -284,32 +426,26 @@ else:
                 std_dev = 0
 
             # KPIs at the top
-            col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Pontos Realizados", total_pontos)
-            col2.metric("Progresso da Meta", f"{percentual_atingido:.2f}%")
-            col3.metric("Pontos Restantes", pontos_restantes)
-            col4.metric("Extensão Total (km)", f"{total_line_extension_km:.2f}")
+            secao_kpis(total_pontos, pontos_restantes, percentual_atingido, total_line_extension_km)
 
             # Tabs for Overview and Name-specific Statistics
-            tab1, tab2 = st.tabs(["📊 Visão Geral", "📋 Estatísticas por Nome"])
+            tab1, tab2, tab3, tab4 = st.tabs(["📊 Visão Geral", "📋 Estatísticas por Nome", "⏱️ Produtividade", "🗺️ Mapa"])
 
             with tab1:
-                col1, col2 = st.columns(2)
-                with col1:
-                    display_meta_progress(total_pontos, pontos_restantes, percentual_atingido)
-                    display_basic_stats_daily(df_daily, std_dev)
-                with col2:
-                    display_chart(filtered_df, key="chart_visao_geral")
-                    display_goal_projection(dias_necessarios, data_projecao_termino)
+                secao_visao_geral(filtered_df, df_daily, std_dev, total_pontos, pontos_restantes, percentual_atingido,
+                                  dias_necessarios, data_projecao_termino)
 
             with tab2:
-                for idx, name in enumerate(selected_names):
-                    st.subheader(f"Estatísticas de {name}")
-                    name_df = filtered_df[filtered_df['nome'] == name]
-                    if not name_df.empty:
-                        display_chart(name_df, key=f"chart_{name}_{idx}")
-                    else:
-                        st.warning(f"⚠️ Não foram encontrados dados para {name}.")
+                secao_por_nome(filtered_df, selected_names)
+
+            with tab3:
+                secao_produtividade(filtered_df, controle_df, start_date, end_date, selected_names)
+
+            with tab4:
+                show_mapa(camadas)
+
+            if modo_agregado and fonte_dados:
+                secao_registros_brutos(fonte_dados, encoding_dados, end_date, selected_names)
 
             st.markdown("---")
             st.markdown(
@@ -329,3 +465,6 @@ else:
             )
     else:
         st.error("Os dados não puderam ser carregados.")
+
+    # Exibido por último para que os contadores incluam os gráficos desta execução
+    exibir_estatisticas_cache()